@@ -1,8 +1,10 @@
 import logging
 import os
+import pickle
+import tempfile
 from abc import ABC, abstractmethod, abstractproperty
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 
 import numpy as np
 import pandas as pd
@@ -10,7 +12,7 @@ import pytorch_lightning as pl
 import torch
 from torch.utils.data import DataLoader, Dataset
 
-from src.fdiff.utils.dataclasses import collate_batch
+from src.fdiff.utils.dataclasses import DiffusableBatch, collate_tensors
 from src.fdiff.utils.fourier import dft, localization_metrics, smooth_frequency
 from src.fdiff.utils.preprocessing import (
     droughts_preprocess,
@@ -20,6 +22,18 @@ from src.fdiff.utils.preprocessing import (
 )
 
 
+def _dataset_dft(X: torch.Tensor) -> torch.Tensor:
+    # The DFT of a whole dataset is computed once, so it is worth offloading to the GPU when available
+    if torch.cuda.is_available():
+        try:
+            return dft(X.contiguous().cuda()).cpu()
+        except torch.cuda.OutOfMemoryError:
+            # The GPU may already hold a model, large datasets are then transformed on CPU
+            torch.cuda.empty_cache()
+            logging.warning("Not enough GPU memory for the dataset DFT, using CPU.")
+    return dft(X)
+
+
 class DiffusionDataset(Dataset):
     def __init__(
         self,
@@ -28,6 +42,8 @@ class DiffusionDataset(Dataset):
         fourier_transform: bool = False,
         standardize: bool = False,
         X_ref: Optional[torch.Tensor] = None,
+        storage_dtype: torch.dtype = torch.float32,
+        x_ref_already_transformed: bool = False,
     ) -> None:
         """Dataset for diffusion models.
 
@@ -37,35 +53,80 @@ class DiffusionDataset(Dataset):
             fourier_transform (bool, optional): Performs a Fourier transform on the time series. Defaults to False.
             standardize (bool, optional): Standardize each feature in the dataset. Defaults to False.
             X_ref (Optional[torch.Tensor], optional): Features used to compute the mean and std. Defaults to None.
+            storage_dtype (torch.dtype, optional): Precision used to store the time series once transformed,
+                they are cast back to float32 when fetched. Defaults to torch.float32.
+            x_ref_already_transformed (bool, optional): X_ref is already in the frequency domain, so the Fourier
+                transform is not applied to it. Defaults to False.
         """
         super().__init__()
+        if X_ref is X:
+            X_ref = None
         if fourier_transform:
-            X = dft(X).detach()
-        self.X = X
-        self.y = y
-        self.standardize = standardize
+            X = _dataset_dft(X)
         if X_ref is None:
             X_ref = X
-        elif fourier_transform:
-            X_ref = dft(X_ref).detach()
+        elif fourier_transform and not x_ref_already_transformed:
+            X_ref = _dataset_dft(X_ref)
         assert isinstance(X_ref, torch.Tensor)
-        self.feature_mean = X_ref.mean(dim=0)
-        self.feature_std = X_ref.std(dim=0)
+        # Both statistics are computed in a single pass, the std is floored to handle constant features
+        feature_std, self.feature_mean = torch.std_mean(X_ref, dim=0)
+        self.feature_std = feature_std.clamp_min(1e-8)
+
+        # The statistics are fixed, so the whole dataset is standardized once and for all
+        if standardize:
+            X = (X - self.feature_mean) / self.feature_std
+        self.X = X.to(storage_dtype)
+        self.y = y
+        self.standardize = standardize
 
     def __len__(self) -> int:
         return len(self.X)
 
-    def __getitem__(self, index: int) -> dict[str, torch.Tensor]:
-        data = {}
-        data["X"] = self.X[index]
-        if self.standardize:
-            data["X"] = (data["X"] - self.feature_mean) / self.feature_std
-        if self.y is not None:
-            data["y"] = self.y[index]
-        return data
+    def __getitem__(self, index: int) -> tuple[torch.Tensor, Optional[torch.Tensor]]:
+        return self.X[index].float(), self.y[index] if self.y is not None else None
+
+    def __getitems__(
+        self, indices: list[int] | torch.Tensor
+    ) -> tuple[torch.Tensor, Optional[torch.Tensor]]:
+        # Used by the DataLoader to fetch a whole batch with a single indexing operation
+        return self.X[indices].float(), self.y[indices] if self.y is not None else None
+
+
+class FastTensorDataLoader:
+    def __init__(
+        self,
+        dataset: DiffusionDataset,
+        batch_size: int = 32,
+        shuffle: bool = False,
+    ) -> None:
+        """Single-process dataloader that slices the batches directly from the tensors of a dataset.
+
+        Args:
+            dataset (DiffusionDataset): Dataset whose tensors are already in memory.
+            batch_size (int, optional): Number of time series per batch. Defaults to 32.
+            shuffle (bool, optional): Draw a new permutation of the samples at each epoch. Defaults to False.
+        """
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def __len__(self) -> int:
+        return (len(self.dataset) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[DiffusableBatch]:
+        n_samples = len(self.dataset)
+        indices = torch.randperm(n_samples) if self.shuffle else torch.arange(n_samples)
+        # Batches are not pinned: pinning in the iterating thread is a blocking copy that costs more than it saves
+        for start in range(0, n_samples, self.batch_size):
+            yield collate_tensors(
+                self.dataset.__getitems__(indices[start : start + self.batch_size])
+            )
 
 
 class Datamodule(pl.LightningDataModule, ABC):
+    # Version of the tensors cached by _load_cached, to bump whenever the parsing of the raw files changes
+    cache_version: int = 1
+
     def __init__(
         self,
         data_dir: Path | str = Path.cwd() / "data",
@@ -73,7 +134,32 @@ class Datamodule(pl.LightningDataModule, ABC):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
     ) -> None:
+        """Base datamodule for the time series datasets.
+
+        Args:
+            data_dir (Path | str, optional): Directory where the datasets are stored. Defaults to Path.cwd()/"data".
+            random_seed (int, optional): Random seed used for preprocessing. Defaults to 42.
+            batch_size (int, optional): Number of time series per batch. Defaults to 32.
+            fourier_transform (bool, optional): Feeds the model with the DFT of the time series. Defaults to False.
+            standardize (bool, optional): Standardize each feature with the training set statistics. Defaults to False.
+            num_workers (int, optional): Number of subprocesses used to load the batches. Setting it to 0 opts into
+                a FastTensorDataLoader for training, which slices the batches directly from the in-memory tensors.
+                Defaults to 4.
+            pin_memory (bool, optional): Copy the batches in page-locked memory, which allows Lightning to move
+                them asynchronously (non_blocking=True) to the GPU. Ignored by the FastTensorDataLoader.
+                Defaults to True.
+            persistent_workers (bool, optional): Keep the workers alive between epochs. Defaults to True.
+            prefetch_factor (int, optional): Number of batches loaded in advance by each worker. Values above 2
+                barely speed up loading and increase the risk of running out of memory. Defaults to 2.
+            storage_dtype (str, optional): Name of the torch dtype used to store the datasets fed to the model,
+                e.g. "bfloat16" to halve their memory footprint. The batches are always float32. Defaults to "float32".
+        """
         super().__init__()
         # Cast data_dir to Path type
         if isinstance(data_dir, str):
@@ -83,10 +169,67 @@ class Datamodule(pl.LightningDataModule, ABC):
         self.batch_size = batch_size
         self.fourier_transform = fourier_transform
         self.standardize = standardize
+        self.num_workers = num_workers
+        self.pin_memory = pin_memory
+        self.persistent_workers = persistent_workers
+        self.prefetch_factor = prefetch_factor
+        self.storage_dtype = getattr(torch, storage_dtype, None)
+        assert isinstance(
+            self.storage_dtype, torch.dtype
+        ), f"{storage_dtype} is not a valid torch dtype."
+        # Standardized features and their DFT would be truncated by an integer dtype
+        assert (
+            self.storage_dtype.is_floating_point
+        ), f"{storage_dtype} is not a floating point dtype."
+        self._X_train_dft: Optional[torch.Tensor] = None
+        self._train_set: Optional[DiffusionDataset] = None
+        self._val_set: Optional[DiffusionDataset] = None
+        self._test_set: Optional[DiffusionDataset] = None
         self.X_train = torch.Tensor()
-        self.y_train: Optional[torch.Tensor] = None
+        self.y_train = None
         self.X_test = torch.Tensor()
-        self.y_test: Optional[torch.Tensor] = None
+        self.y_test = None
+
+    @property
+    def X_train(self) -> torch.Tensor:
+        return self._X_train
+
+    @X_train.setter
+    def X_train(self, X: torch.Tensor) -> None:
+        # The cached datasets depend on the features and labels, they are rebuilt when those change
+        self._X_train = X
+        self._X_train_dft = None
+        self._train_set = None
+        self._val_set = None
+
+    @property
+    def X_test(self) -> torch.Tensor:
+        return self._X_test
+
+    @X_test.setter
+    def X_test(self, X: torch.Tensor) -> None:
+        self._X_test = X
+        self._val_set = None
+        self._test_set = None
+
+    @property
+    def y_train(self) -> Optional[torch.Tensor]:
+        return self._y_train
+
+    @y_train.setter
+    def y_train(self, y: Optional[torch.Tensor]) -> None:
+        self._y_train = y
+        self._train_set = None
+
+    @property
+    def y_test(self) -> Optional[torch.Tensor]:
+        return self._y_test
+
+    @y_test.setter
+    def y_test(self, y: Optional[torch.Tensor]) -> None:
+        self._y_test = y
+        self._val_set = None
+        self._test_set = None
 
     def prepare_data(self) -> None:
         if not self.data_dir.exists():
@@ -99,44 +242,105 @@ class Datamodule(pl.LightningDataModule, ABC):
         """Download the data."""
         ...
 
-    def train_dataloader(self) -> DataLoader:
-        train_set = DiffusionDataset(
-            X=self.X_train,
-            y=self.y_train,
-            fourier_transform=self.fourier_transform,
-            standardize=self.standardize,
-        )
-        return DataLoader(
-            train_set,
-            batch_size=self.batch_size,
-            shuffle=True,
-            collate_fn=collate_batch,
-        )
+    def train_dataloader(self) -> DataLoader | FastTensorDataLoader:
+        train_set = self._get_train_set()
+        # Without workers, batches are sliced directly from the tensors, bypassing the DataLoader machinery
+        # Distributed training keeps the DataLoader, the only type Lightning can shard with a DistributedSampler
+        distributed = self.trainer is not None and self.trainer.world_size > 1
+        if self.num_workers == 0 and not distributed:
+            return FastTensorDataLoader(
+                train_set, batch_size=self.batch_size, shuffle=True
+            )
+        return self._make_dataloader(train_set, shuffle=True)
 
     def test_dataloader(self) -> DataLoader:
-        test_set = DiffusionDataset(
-            X=self.X_test, y=self.y_test, fourier_transform=self.fourier_transform
-        )
-        return DataLoader(
-            test_set,
-            batch_size=self.batch_size,
-            shuffle=False,
-            collate_fn=collate_batch,
-        )
+        if self._test_set is None:
+            self._test_set = DiffusionDataset(
+                X=self.X_test,
+                y=self.y_test,
+                fourier_transform=self.fourier_transform,
+                storage_dtype=self.storage_dtype,
+            )
+        return self._make_dataloader(self._test_set, shuffle=False)
 
     def val_dataloader(self) -> DataLoader:
-        test_set = DiffusionDataset(
-            X=self.X_test,
-            y=self.y_test,
-            fourier_transform=self.fourier_transform,
-            standardize=self.standardize,
-            X_ref=self.X_train,
-        )
+        if self._val_set is None:
+            self._val_set = DiffusionDataset(
+                X=self.X_test,
+                y=self.y_test,
+                fourier_transform=self.fourier_transform,
+                standardize=self.standardize,
+                X_ref=self._get_X_train_dft(),
+                storage_dtype=self.storage_dtype,
+                x_ref_already_transformed=True,
+            )
+        return self._make_dataloader(self._val_set, shuffle=False)
+
+    def _get_train_set(self) -> DiffusionDataset:
+        if self._train_set is None:
+            # The training set is already transformed, hence fourier_transform=False
+            self._train_set = DiffusionDataset(
+                X=self._get_X_train_dft(),
+                y=self.y_train,
+                standardize=self.standardize,
+                storage_dtype=self.storage_dtype,
+            )
+        return self._train_set
+
+    def _get_X_train_dft(self) -> torch.Tensor:
+        # The transformed training set is shared by the training and validation datasets
+        if not self.fourier_transform:
+            return self.X_train
+        if self._X_train_dft is None:
+            self._X_train_dft = _dataset_dft(self.X_train)
+        return self._X_train_dft
+
+    def _load_cached(self, parse: Callable[[], None], sources: list[Path]) -> None:
+        # Tensors parsed from raw files are cached to avoid parsing them at each run
+        # The cache is only reused if neither the parsing nor the raw files changed since it was written
+        path_cache = self.data_dir / "cached.pt"
+        cache_key = {
+            "version": self.cache_version,
+            "source_mtimes": [os.path.getmtime(source) for source in sources],
+        }
+        if path_cache.exists():
+            try:
+                cache = torch.load(path_cache)
+            except (RuntimeError, OSError, EOFError, pickle.UnpicklingError):
+                logging.warning(f"Cached tensors in {path_cache} are unreadable.")
+                cache = None
+            if isinstance(cache, dict) and cache.get("key") == cache_key:
+                logging.info(f"Loading cached tensors from {path_cache}.")
+                self.X_train, self.y_train, self.X_test, self.y_test = cache["tensors"]
+                return
+            logging.info(f"Cached tensors in {path_cache} are outdated, parsing again.")
+        parse()
+
+        # The cache is written to a temporary file first, then atomically moved in place,
+        # so that concurrent (e.g. DDP ranks) or interrupted writes never leave a partial file
+        tensors = (self.X_train, self.y_train, self.X_test, self.y_test)
+        with tempfile.NamedTemporaryFile(
+            dir=self.data_dir, suffix=".pt.tmp", delete=False
+        ) as f:
+            path_tmp = Path(f.name)
+        try:
+            torch.save({"key": cache_key, "tensors": tensors}, path_tmp)
+            os.replace(path_tmp, path_cache)
+        finally:
+            path_tmp.unlink(missing_ok=True)
+
+    def _make_dataloader(self, dataset: Dataset, shuffle: bool) -> DataLoader:
+        # Worker-related options are only accepted by PyTorch in multiprocessing mode
+        multiprocessing = self.num_workers > 0
         return DataLoader(
-            test_set,
+            dataset,
             batch_size=self.batch_size,
-            shuffle=False,
-            collate_fn=collate_batch,
+            shuffle=shuffle,
+            collate_fn=collate_tensors,
+            num_workers=self.num_workers,
+            pin_memory=self.pin_memory and torch.cuda.is_available(),
+            persistent_workers=self.persistent_workers and multiprocessing,
+            prefetch_factor=self.prefetch_factor if multiprocessing else None,
         )
 
     @abstractproperty
@@ -144,24 +348,24 @@ class Datamodule(pl.LightningDataModule, ABC):
 
     @property
     def dataset_parameters(self) -> dict[str, Any]:
+        # Number of batches per epoch, computed without building the training dataloader
+        num_batches = (len(self.X_train) + self.batch_size - 1) // self.batch_size
         return {
             "n_channels": self.X_train.size(2),
             "max_len": self.X_train.size(1),
-            "num_training_steps": len(self.train_dataloader()),
+            "num_training_steps": num_batches,
         }
 
     @property
     def feature_mean_and_std(self) -> tuple[torch.Tensor, torch.Tensor]:
-        train_set = DiffusionDataset(
-            X=self.X_train,
-            y=self.y_train,
-            fourier_transform=self.fourier_transform,
-            standardize=self.standardize,
-        )
+        train_set = self._get_train_set()
         return train_set.feature_mean, train_set.feature_std
 
 
 class ECGDatamodule(Datamodule):
+    # Version 2 parses the CSV files without header, which keeps their first heartbeat
+    cache_version: int = 2
+
     def __init__(
         self,
         data_dir: Path | str = Path.cwd() / "data",
@@ -169,6 +373,11 @@ class ECGDatamodule(Datamodule):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
         subsample_localization: bool = False,
         smooth_frequency: bool = False,
         smoother_width: float = 0.0,
@@ -179,54 +388,74 @@ class ECGDatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
+            storage_dtype=storage_dtype,
         )
         self.subsample_localization = subsample_localization
         self.smooth_frequency = smooth_frequency
         self.smoother_width = smoother_width
 
     def setup(self, stage: str = "fit") -> None:
-        # Read CSV; extract features and labels
-        path_train = self.data_dir / "mitbih_train.csv"
-        path_test = self.data_dir / "mitbih_test.csv"
-
-        # Read data
-        df_train = pd.read_csv(path_train)
-        X_train = df_train.iloc[:, :187].values
-        y_train = df_train.iloc[:, 187].values
-        df_test = pd.read_csv(path_test)
-        X_test = df_test.iloc[:, :187].values
-        y_test = df_test.iloc[:, 187].values
-
-        # Convert to tensor
-        self.X_train = torch.tensor(X_train, dtype=torch.float32).unsqueeze(2)
-        self.y_train = torch.tensor(y_train, dtype=torch.long)
-        self.X_test = torch.tensor(X_test, dtype=torch.float32).unsqueeze(2)
-        self.y_test = torch.tensor(y_test, dtype=torch.long)
+        self._load_cached(
+            self._parse_csv,
+            sources=[
+                self.data_dir / "mitbih_train.csv",
+                self.data_dir / "mitbih_test.csv",
+            ],
+        )
 
         # In case of subsampling, we only keep the time series that are most localized in time
         if self.subsample_localization:
             X_loc, X_spec_loc = localization_metrics(self.X_train)
             loc_score = X_loc / X_spec_loc
-            idx_ranking = torch.argsort(loc_score, descending=False)
-            self.X_train = self.X_train[idx_ranking[:1000]]
-            self.y_train = self.y_train[idx_ranking[:1000]]
-            X_loc, X_spec_loc = localization_metrics(self.X_train)
+            idx_subsample = torch.argsort(loc_score, descending=False)[:1000]
+            self.X_train = self.X_train[idx_subsample]
+            self.y_train = self.y_train[idx_subsample]
             logging.info("Subsampling the training set based on localization metrics.")
-            logging.info(f"New time delocalization: {X_loc.mean().item():.3g}")
-            logging.info(
-                f"New frequency delocalization: {X_spec_loc.mean().item():.3g}"
-            )
+            # The metrics are per sample, so those of the subsample are already computed
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                X_loc, X_spec_loc = X_loc[idx_subsample], X_spec_loc[idx_subsample]
+                logging.info(f"New time delocalization: {X_loc.mean().item():.3g}")
+                logging.info(
+                    f"New frequency delocalization: {X_spec_loc.mean().item():.3g}"
+                )
 
         # In case of frequency convolution, we convolve the frequency domain with a Gaussian kernel
         if self.smooth_frequency and self.smoother_width > 0.0:
             self.X_train = smooth_frequency(self.X_train, sigma=self.smoother_width)
             self.X_test = smooth_frequency(self.X_test, sigma=self.smoother_width)
             logging.info("Smoothing the frequency domain of the data.")
-            X_loc, X_spec_loc = localization_metrics(self.X_train)
-            logging.info(f"New time delocalization: {X_loc.mean().item():.3g}")
-            logging.info(
-                f"New frequency delocalization: {X_spec_loc.mean().item():.3g}"
-            )
+            # The metrics are only used for logging, skip them if they are not logged
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                X_loc, X_spec_loc = localization_metrics(self.X_train)
+                logging.info(f"New time delocalization: {X_loc.mean().item():.3g}")
+                logging.info(
+                    f"New frequency delocalization: {X_spec_loc.mean().item():.3g}"
+                )
+
+    def _parse_csv(self) -> None:
+        # Read CSV; extract features and labels
+        path_train = self.data_dir / "mitbih_train.csv"
+        path_test = self.data_dir / "mitbih_test.csv"
+
+        # Read data; parsing directly in float32 avoids a float64 intermediate
+        df_train = pd.read_csv(path_train, header=None, dtype=np.float32)
+        X_train = df_train.iloc[:, :187].to_numpy(copy=False)
+        y_train = df_train.iloc[:, 187].to_numpy().astype(np.int64, copy=False)
+        df_test = pd.read_csv(path_test, header=None, dtype=np.float32)
+        X_test = df_test.iloc[:, :187].to_numpy(copy=False)
+        y_test = df_test.iloc[:, 187].to_numpy().astype(np.int64, copy=False)
+
+        # Convert to tensor; pandas stores the features column-major, so they are made row-major first
+        X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+        X_test = np.ascontiguousarray(X_test, dtype=np.float32)
+        self.X_train = torch.from_numpy(X_train).unsqueeze(2)
+        self.y_train = torch.from_numpy(y_train)
+        self.X_test = torch.from_numpy(X_test).unsqueeze(2)
+        self.y_test = torch.from_numpy(y_test)
 
     def download_data(self) -> None:
         import kaggle
@@ -249,6 +478,11 @@ class SyntheticDatamodule(Datamodule):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
         max_len: int = 100,
         num_samples: int = 1000,
     ) -> None:
@@ -258,28 +492,49 @@ class SyntheticDatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
+            storage_dtype=storage_dtype,
         )
         self.max_len = max_len
         self.num_samples = num_samples
 
     def setup(self, stage: str = "fit") -> None:
-        # Read CSV; extract features and labels
+        # Datasets generated before the switch to .npy files are stored as CSV
+        if (self.data_dir / "train.csv").exists() or not (
+            self.data_dir / "train.npy"
+        ).exists():
+            self._load_cached(
+                self._parse_csv,
+                sources=[self.data_dir / "train.csv", self.data_dir / "test.csv"],
+            )
+            return
+
+        # Read data
+        X_train = np.load(self.data_dir / "train.npy")
+        X_test = np.load(self.data_dir / "test.npy")
+
+        # Convert to tensor
+        self.X_train = torch.from_numpy(X_train).unsqueeze(2)  # Add a channel dimension
+        self.y_train = None
+        self.X_test = torch.from_numpy(X_test).unsqueeze(2)
+        self.y_test = None
+
+    def _parse_csv(self) -> None:
+        # Read CSV; the data is purely numeric so it can be parsed without pandas
         path_train = self.data_dir / "train.csv"
         path_test = self.data_dir / "test.csv"
 
         # Read data
-        df_train = pd.read_csv(path_train, header=None)
-        X_train = df_train.values
-
-        df_test = pd.read_csv(path_test, header=None)
-        X_test = df_test.values
+        X_train = np.loadtxt(path_train, delimiter=",", dtype=np.float32, ndmin=2)
+        X_test = np.loadtxt(path_test, delimiter=",", dtype=np.float32, ndmin=2)
 
         # Convert to tensor
-        self.X_train = torch.tensor(X_train, dtype=torch.float32).unsqueeze(
-            2
-        )  # Add a channel dimension
+        self.X_train = torch.from_numpy(X_train).unsqueeze(2)  # Add a channel dimension
         self.y_train = None
-        self.X_test = torch.tensor(X_test, dtype=torch.float32).unsqueeze(2)
+        self.X_test = torch.from_numpy(X_test).unsqueeze(2)
         self.y_test = None
 
     def download_data(self) -> None:
@@ -293,11 +548,9 @@ class SyntheticDatamodule(Datamodule):
         X_train = X[: self.num_samples]
         X_test = X[self.num_samples :]
 
-        # Save data
-        df_train = pd.DataFrame(X_train)
-        df_test = pd.DataFrame(X_test)
-        df_train.to_csv(self.data_dir / "train.csv", index=False, header=False)
-        df_test.to_csv(self.data_dir / "test.csv", index=False, header=False)
+        # Save data in binary format, which is much faster to write and read than CSV
+        np.save(self.data_dir / "train.npy", X_train.astype(np.float32))
+        np.save(self.data_dir / "test.npy", X_test.astype(np.float32))
 
     @property
     def dataset_name(self) -> str:
@@ -312,6 +565,11 @@ class MIMICIIIDatamodule(Datamodule):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
         n_feats: int = 40,
     ) -> None:
         super().__init__(
@@ -320,6 +578,11 @@ class MIMICIIIDatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
+            storage_dtype=storage_dtype,
         )
         self.n_feats = n_feats
 
@@ -337,9 +600,13 @@ class MIMICIIIDatamodule(Datamodule):
                 f"Preprocessing pipeline finished, tensors saved in {self.data_dir}."
             )
 
-        # Load preprocessed tensors
-        self.X_train = torch.load(self.data_dir / "X_train.pt")
-        self.X_test = torch.load(self.data_dir / "X_test.pt")
+        # Load preprocessed tensors, memory-mapped so that discarded entries are never copied
+        self.X_train = torch.load(
+            self.data_dir / "X_train.pt", map_location="cpu", mmap=True
+        )
+        self.X_test = torch.load(
+            self.data_dir / "X_test.pt", map_location="cpu", mmap=True
+        )
 
         assert isinstance(self.X_train, torch.Tensor)
         assert isinstance(self.X_test, torch.Tensor)
@@ -349,8 +616,9 @@ class MIMICIIIDatamodule(Datamodule):
         top_feats = torch.argsort(self.X_train.std(0).mean(0), descending=True)[
             : self.n_feats
         ]
-        self.X_train = self.X_train[:, :, top_feats]
-        self.X_test = self.X_test[:, :, top_feats]
+        # The gather copies the selected features in a contiguous tensor, as expected by the DFT
+        self.X_train = self.X_train.index_select(2, top_feats).contiguous()
+        self.X_test = self.X_test.index_select(2, top_feats).contiguous()
 
     def download_data(self) -> None:
         dataset_path = self.data_dir / "all_hourly_data.h5"
@@ -374,6 +642,11 @@ class NASDAQDatamodule(Datamodule):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
     ) -> None:
         super().__init__(
             data_dir=data_dir,
@@ -381,6 +654,11 @@ class NASDAQDatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
+            storage_dtype=storage_dtype,
         )
 
     def setup(self, stage: str = "fit") -> None:
@@ -397,17 +675,22 @@ class NASDAQDatamodule(Datamodule):
                 f"Preprocessing pipeline finished, tensors saved in {self.data_dir}."
             )
 
-        # Load preprocessed tensors
-        self.X_train = torch.load(self.data_dir / "X_train.pt")
-        self.X_test = torch.load(self.data_dir / "X_test.pt")
+        # Load preprocessed tensors, memory-mapped so that discarded entries are never copied
+        self.X_train = torch.load(
+            self.data_dir / "X_train.pt", map_location="cpu", mmap=True
+        )
+        self.X_test = torch.load(
+            self.data_dir / "X_test.pt", map_location="cpu", mmap=True
+        )
 
         assert isinstance(self.X_train, torch.Tensor)
         assert isinstance(self.X_test, torch.Tensor)
         assert self.X_train.shape[1:] == self.X_test.shape[1:] == (252, 6)
 
         # Filter out the last feature (volume) due to awkward scaling
-        self.X_train = self.X_train[:, :, :-1]
-        self.X_test = self.X_test[:, :, :-1]
+        # The copy to contiguous memory releases the memory-mapped tensors
+        self.X_train = self.X_train[:, :, :-1].contiguous()
+        self.X_test = self.X_test[:, :, :-1].contiguous()
 
     def download_data(self) -> None:
         import kaggle
@@ -430,6 +713,11 @@ class NASADatamodule(Datamodule):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
         subdataset: str = "charge",
         remove_outlier_feature: bool = True,
     ) -> None:
@@ -442,6 +730,11 @@ class NASADatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
+            storage_dtype=storage_dtype,
         )
 
     def setup(self, stage: str = "fit") -> None:
@@ -462,18 +755,30 @@ class NASADatamodule(Datamodule):
                 f"Preprocessing pipeline finished, tensors saved in {self.data_dir}."
             )
 
-        # Load preprocessed tensors
-        self.X_train = torch.load(self.data_dir / self.subdataset / "X_train.pt")
-        self.X_test = torch.load(self.data_dir / self.subdataset / "X_test.pt")
+        # Load preprocessed tensors, memory-mapped so that discarded entries are never copied
+        self.X_train = torch.load(
+            self.data_dir / self.subdataset / "X_train.pt",
+            map_location="cpu",
+            mmap=True,
+        )
+        self.X_test = torch.load(
+            self.data_dir / self.subdataset / "X_test.pt", map_location="cpu", mmap=True
+        )
 
         if self.remove_outlier_feature and self.subdataset == "charge":
             # Remove the third feature which has a bad range
-            self.X_train = self.X_train[:, ::2, [0, 1, 3, 4]]
-            self.X_test = self.X_test[:, ::2, [0, 1, 3, 4]]
+            # The gather on the strided view copies the kept entries once, in a contiguous tensor
+            feats = torch.tensor([0, 1, 3, 4], dtype=torch.long)
+            self.X_train = self.X_train[:, ::2].index_select(2, feats).contiguous()
+            self.X_test = self.X_test[:, ::2].index_select(2, feats).contiguous()
 
             assert self.X_train.shape[2] == self.X_test.shape[2] == 4
             assert self.X_train.shape[1] == 251
             assert self.X_test.shape[1] == 251
+        else:
+            # Nothing is filtered, the copy in memory releases the memory-mapped tensors
+            self.X_train = self.X_train.clone()
+            self.X_test = self.X_test.clone()
         assert isinstance(self.X_train, torch.Tensor)
         assert isinstance(self.X_test, torch.Tensor)
 
@@ -498,6 +803,11 @@ class USDroughtsDatamodule(Datamodule):
         batch_size: int = 32,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        pin_memory: bool = True,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 2,
+        storage_dtype: str = "float32",
     ) -> None:
         super().__init__(
             data_dir=data_dir,
@@ -505,6 +815,11 @@ class USDroughtsDatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
+            storage_dtype=storage_dtype,
         )
 
     def setup(self, stage: str = "fit") -> None:
@@ -522,14 +837,21 @@ class USDroughtsDatamodule(Datamodule):
                 f"Preprocessing pipeline finished, tensors saved in {self.data_dir}."
             )
 
-        # Load preprocessed tensors
-        self.X_train: torch.Tensor = torch.load(self.data_dir / "X_train.pt")
-        self.X_test: torch.Tensor = torch.load(self.data_dir / "X_test.pt")
+        # Load preprocessed tensors, memory-mapped so that discarded entries are never copied
+        self.X_train = torch.load(
+            self.data_dir / "X_train.pt", map_location="cpu", mmap=True
+        )
+        self.X_test = torch.load(
+            self.data_dir / "X_test.pt", map_location="cpu", mmap=True
+        )
 
         # Remove features that have high correlation with T2M
-        feats = [i for i in range(self.X_train.shape[2]) if i not in {4, 5, 6, 7, 9}]
-        self.X_train = self.X_train[:, :, feats]
-        self.X_test = self.X_test[:, :, feats]
+        feats = torch.tensor(
+            [i for i in range(self.X_train.shape[2]) if i not in {4, 5, 6, 7, 9}],
+            dtype=torch.long,
+        )
+        self.X_train = self.X_train.index_select(2, feats).contiguous()
+        self.X_test = self.X_test.index_select(2, feats).contiguous()
 
         # Check tensors
         assert isinstance(self.X_train, torch.Tensor)
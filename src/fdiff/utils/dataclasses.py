@@ -17,15 +17,19 @@ class DiffusableBatch:
     def device(self) -> torch.device:
         return self.X.device
 
-
-def collate_batch(data: list[dict[str, torch.Tensor]]) -> DiffusableBatch:
-    assert "X" in data[0], "The construction of a batch requires a 'X' key."
-
-    X = torch.stack([example["X"] for example in data])
-    y = torch.stack([example["y"] for example in data]) if "y" in data[0] else None
-    timesteps = (
-        torch.stack([example["timestep"] for example in data])
-        if "timestep" in data[0]
-        else None
-    )
-    return DiffusableBatch(X=X, y=y, timesteps=timesteps)
+    def pin_memory(self) -> "DiffusableBatch":
+        # Called by the DataLoader when pin_memory=True, this allows asynchronous copies to the GPU
+        return DiffusableBatch(
+            X=self.X.pin_memory(),
+            y=self.y.pin_memory() if self.y is not None else None,
+            timesteps=(
+                self.timesteps.pin_memory() if self.timesteps is not None else None
+            ),
+        )
+
+
+def collate_tensors(
+    data: tuple[torch.Tensor, Optional[torch.Tensor]],
+) -> DiffusableBatch:
+    X, y = data
+    return DiffusableBatch(X=X, y=y)
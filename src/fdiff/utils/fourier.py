@@ -5,6 +5,7 @@ from einops import rearrange
 from torch.fft import irfft, rfft
 
 
+@torch.no_grad()
 def dft(x: torch.Tensor) -> torch.Tensor:
     """Compute the DFT of the input time series by keeping only the non-redundant components.
 
@@ -17,8 +18,8 @@ def dft(x: torch.Tensor) -> torch.Tensor:
 
     max_len = x.size(1)
 
-    # Compute the FFT until the Nyquist frequency
-    dft_full = rfft(x, dim=1, norm="ortho")
+    # Compute the FFT until the Nyquist frequency, batched over samples and channels in a single call
+    dft_full = rfft(x.contiguous(), dim=1, norm="ortho")
     dft_re = torch.real(dft_full)
     dft_im = torch.imag(dft_full)
 
@@ -1,10 +1,21 @@
+import os
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 
+import numpy as np
+import pytest
 import torch
+from torch.utils.data import DataLoader
 
-from src.fdiff.dataloaders.datamodules import Datamodule
+from src.fdiff.dataloaders.datamodules import (
+    Datamodule,
+    DiffusionDataset,
+    FastTensorDataLoader,
+    SyntheticDatamodule,
+)
 from src.fdiff.utils.dataclasses import DiffusableBatch
-from src.fdiff.utils.fourier import idft
+from src.fdiff.utils.fourier import dft, idft
 
 max_len = 30
 n_channels = 3
@@ -23,6 +34,8 @@ class DummyDatamodule(Datamodule):
         n_channels: int = n_channels,
         fourier_transform: bool = False,
         standardize: bool = False,
+        num_workers: int = 4,
+        storage_dtype: str = "float32",
     ) -> None:
         super().__init__(
             data_dir=data_dir,
@@ -30,6 +43,8 @@ class DummyDatamodule(Datamodule):
             batch_size=batch_size,
             fourier_transform=fourier_transform,
             standardize=standardize,
+            num_workers=num_workers,
+            storage_dtype=storage_dtype,
         )
         self.max_len = max_len
         self.n_channels = n_channels
@@ -64,6 +79,54 @@ def test_dataloader() -> None:
         assert batch.y.shape == (batch_size,)
 
 
+def test_fast_dataloader() -> None:
+    datamodule = DummyDatamodule(num_workers=0)
+    datamodule.prepare_data()
+    datamodule.setup()
+    dataloader = datamodule.train_dataloader()
+    assert isinstance(dataloader, FastTensorDataLoader)
+    assert len(dataloader) == datamodule.dataset_parameters["num_training_steps"]
+    X_batches = []
+    for batch in dataloader:
+        assert isinstance(batch, DiffusableBatch)
+        assert batch.X.shape == (batch_size, max_len, n_channels)
+        assert batch.y.shape == (batch_size,)
+        X_batches.append(batch.X)
+
+    # Each sample appears exactly once per epoch
+    X = torch.cat(X_batches)
+    assert torch.equal(X.sort(0).values, datamodule.X_train.sort(0).values)
+
+
+def test_fast_dataloader_distributed_fallback() -> None:
+    datamodule = DummyDatamodule(num_workers=0)
+    datamodule.prepare_data()
+    datamodule.setup()
+
+    # Distributed training needs a DataLoader so that Lightning can shard the samples
+    datamodule.trainer = SimpleNamespace(world_size=2)  # type: ignore
+    dataloader = datamodule.train_dataloader()
+    assert isinstance(dataloader, DataLoader)
+    assert len(dataloader) == datamodule.dataset_parameters["num_training_steps"]
+
+
+def test_storage_dtype() -> None:
+    datamodule = DummyDatamodule(
+        num_workers=0, standardize=True, storage_dtype="bfloat16"
+    )
+    datamodule.prepare_data()
+    datamodule.setup()
+    dataloader = datamodule.train_dataloader()
+    assert dataloader.dataset.X.dtype == torch.bfloat16
+    for batch in dataloader:
+        assert batch.X.dtype == torch.float32
+
+    # Only floating point dtypes can store the time series
+    for storage_dtype in ["int64", "not_a_dtype"]:
+        with pytest.raises(AssertionError):
+            DummyDatamodule(storage_dtype=storage_dtype)
+
+
 def test_fourier_transform() -> None:
     # Default datamodule
     datamodule = DummyDatamodule()
@@ -89,8 +152,8 @@ def test_standardization() -> None:
 
     train_dataset = datamodule.train_dataloader().dataset
 
-    X_0 = train_dataset.X[0]
-    X_0_standardized = train_dataset[0]["X"]
+    X_0 = datamodule.X_train[0]
+    X_0_standardized, _ = train_dataset[0]
     X_0_unscaled = (
         X_0_standardized * train_dataset.feature_std + train_dataset.feature_mean
     )
@@ -102,8 +165,8 @@ def test_standardization() -> None:
 
     val_dataset = datamodule.val_dataloader().dataset
 
-    X_0 = val_dataset.X[0]
-    X_0_standardized = val_dataset[0]["X"]
+    X_0 = datamodule.X_test[0]
+    X_0_standardized, _ = val_dataset[0]
     X_0_unscaled = X_0_standardized * val_dataset.feature_std + val_dataset.feature_mean
 
     # Assert that X_train and X_unscaled are close
@@ -115,3 +178,97 @@ def test_standardization() -> None:
         val_dataset.feature_mean, train_dataset.feature_mean, atol=1e-5
     )
     assert torch.allclose(val_dataset.feature_std, train_dataset.feature_std, atol=1e-5)
+
+
+def test_dataset_caching() -> None:
+    datamodule = DummyDatamodule(fourier_transform=True, standardize=True)
+    datamodule.prepare_data()
+    datamodule.setup()
+
+    # The datasets are only built once
+    train_dataset = datamodule.train_dataloader().dataset
+    assert datamodule.train_dataloader().dataset is train_dataset
+    assert datamodule.val_dataloader().dataset is datamodule.val_dataloader().dataset
+    feature_mean, _ = datamodule.feature_mean_and_std
+    assert feature_mean is train_dataset.feature_mean
+
+    # The validation set is standardized with the statistics of the transformed training set
+    val_dataset = datamodule.val_dataloader().dataset
+    assert torch.allclose(val_dataset.feature_mean, train_dataset.feature_mean)
+    assert torch.allclose(val_dataset.feature_std, train_dataset.feature_std)
+
+    # Reassigning the training set invalidates the cache
+    datamodule.setup()
+    assert datamodule.train_dataloader().dataset is not train_dataset
+
+    # Reassigning only the labels invalidates the cache as well
+    train_dataset = datamodule.train_dataloader().dataset
+    datamodule.y_train = torch.zeros_like(datamodule.y_train)
+    assert datamodule.train_dataloader().dataset is not train_dataset
+    assert torch.equal(datamodule.train_dataloader().dataset.y, datamodule.y_train)
+
+
+def test_synthetic_datamodule(tmp_path: Path) -> None:
+    datamodule = SyntheticDatamodule(data_dir=tmp_path, max_len=max_len, num_samples=50)
+    datamodule.prepare_data()
+    datamodule.setup()
+    assert datamodule.X_train.shape == datamodule.X_test.shape == (50, max_len, 1)
+    assert datamodule.X_train.dtype == torch.float32
+
+    # Datasets stored as CSV are parsed once, then read from the cached tensors
+    for split, X in [("train", datamodule.X_train), ("test", datamodule.X_test)]:
+        np.savetxt(datamodule.data_dir / f"{split}.csv", X.squeeze(2), delimiter=",")
+    datamodule_csv = SyntheticDatamodule(
+        data_dir=tmp_path, max_len=max_len, num_samples=50
+    )
+    datamodule_csv.setup()
+    assert (datamodule.data_dir / "cached.pt").exists()
+    datamodule_csv.setup()
+    assert torch.allclose(datamodule.X_train, datamodule_csv.X_train)
+    assert torch.allclose(datamodule.X_test, datamodule_csv.X_test)
+
+    # Modifying the CSV files invalidates the cache
+    path_train = datamodule.data_dir / "train.csv"
+    np.savetxt(path_train, 2 * datamodule.X_train.squeeze(2), delimiter=",")
+    mtime = os.path.getmtime(path_train) + 1
+    os.utime(path_train, (mtime, mtime))
+    datamodule_csv.setup()
+    assert torch.allclose(2 * datamodule.X_train, datamodule_csv.X_train)
+
+
+def test_synthetic_datamodule_truncated_cache(tmp_path: Path) -> None:
+    datamodule = SyntheticDatamodule(data_dir=tmp_path, max_len=max_len, num_samples=50)
+    datamodule.prepare_data()
+    datamodule.setup()
+    for split, X in [("train", datamodule.X_train), ("test", datamodule.X_test)]:
+        np.savetxt(datamodule.data_dir / f"{split}.csv", X.squeeze(2), delimiter=",")
+    datamodule.setup()
+
+    # An interrupted write leaves a truncated cache, which is parsed again
+    path_cache = datamodule.data_dir / "cached.pt"
+    cache_bytes = path_cache.read_bytes()
+    path_cache.write_bytes(cache_bytes[: len(cache_bytes) // 2])
+    datamodule_csv = SyntheticDatamodule(
+        data_dir=tmp_path, max_len=max_len, num_samples=50
+    )
+    datamodule_csv.setup()
+    assert torch.allclose(datamodule.X_train, datamodule_csv.X_train)
+    assert path_cache.read_bytes() != cache_bytes[: len(cache_bytes) // 2]
+    assert list(datamodule.data_dir.glob("*.tmp")) == []
+
+
+def test_dataset_dft_cpu_fallback(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    # Simulate a GPU that cannot hold the dataset
+    def cuda_out_of_memory(self: torch.Tensor, *args: Any, **kwargs: Any) -> None:
+        raise torch.cuda.OutOfMemoryError("CUDA out of memory.")
+
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: True)
+    monkeypatch.setattr(torch.Tensor, "cuda", cuda_out_of_memory)
+    monkeypatch.setattr(torch.cuda, "empty_cache", lambda: None)
+
+    X = torch.randn((batch_size, max_len, n_channels))
+    dataset = DiffusionDataset(X=X, fourier_transform=True)
+    assert "using CPU" in caplog.text
+    assert torch.allclose(dataset.X, dft(X))